@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import time
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -24,6 +24,7 @@ class SessionStore:
         session:{id}:seq (int via INCR)
         session:{id}:events (ZSET score=seq value=event JSON)
         session:{id}:idem (HASH client_message_id -> assistant event JSON)
+        session:{id}:idem:resp (HASH client_message_id -> rendered response bytes)
     """
 
     def create_session(
@@ -43,6 +44,13 @@ class SessionStore:
     def append_event(self, session_id: str, event: Event) -> Event:
         raise NotImplementedError
 
+    def subscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        """Call ``notify()`` (no args, must not block) after each append_event."""
+        raise NotImplementedError
+
+    def unsubscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        raise NotImplementedError
+
     def list_events(
         self,
         session_id: str,
@@ -51,15 +59,35 @@ class SessionStore:
     ) -> List[Event]:
         raise NotImplementedError
 
+    def find_last_event(
+        self, session_id: str, since_seq: int, type: str
+    ) -> Optional[Event]:
+        raise NotImplementedError
+
     def get_by_client_message_id(
         self, session_id: str, client_message_id: str
     ) -> Optional[Event]:
         raise NotImplementedError
 
     def remember_client_message(
-        self, session_id: str, client_message_id: str, event: Event
+        self,
+        session_id: str,
+        client_message_id: str,
+        event: Event,
+        response: Optional[bytes] = None,
     ) -> None:
         raise NotImplementedError
 
+    def get_cached_response(
+        self, session_id: str, client_message_id: str
+    ) -> Optional[bytes]:
+        raise NotImplementedError
+
     def delete_session(self, session_id: str) -> None:
         raise NotImplementedError
+
+    def reset_session(
+        self, session_id: str, active_agent_id: str, scenario_id: Optional[str] = None
+    ) -> Session:
+        """Atomically delete then recreate a session (fresh events, seq and usage)."""
+        raise NotImplementedError
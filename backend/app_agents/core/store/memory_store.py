@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import time
 from threading import Lock
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from ..models.event import Event
 from ..models.session import Session
@@ -15,38 +15,69 @@ class InMemorySessionStore(SessionStore):
         self._events: Dict[str, List[Event]] = {}
         self._seq: Dict[str, int] = {}
         self._idempotency: Dict[str, Dict[str, Event]] = {}
+        # Rendered response bodies per client_message_id for byte-for-byte replays
+        self._idem_responses: Dict[str, Dict[str, bytes]] = {}
         self._lock = Lock()
         # Aggregated usage per session
         self._usage = {}
         # Session context payloads (placeholder for Context API integration)
         self._context = {}
+        # Per-session append listeners (e.g. SSE streams waiting for new events)
+        self._listeners: Dict[str, List[Callable[[], None]]] = {}
 
     def create_session(
         self, session_id: str, active_agent_id: str, scenario_id: Optional[str] = None
     ) -> Session:
-        now = int(time.time() * 1000)
         with self._lock:
             sess = self._sessions.get(session_id)
             if not sess:
-                sess = Session(
-                    session_id=session_id,
-                    active_agent_id=active_agent_id,
-                    scenario_id=scenario_id,
-                    created_ms=now,
-                    updated_ms=now,
-                )
-                self._sessions[session_id] = sess
-                self._events[session_id] = []
-                self._seq[session_id] = 0
-                self._idempotency[session_id] = {}
-                self._usage[session_id] = {
-                    "requests": 0,
-                    "input_tokens": 0,
-                    "output_tokens": 0,
-                    "total_tokens": 0,
-                }
+                sess = self._init_session(session_id, active_agent_id, scenario_id)
             return sess
 
+    def reset_session(
+        self, session_id: str, active_agent_id: str, scenario_id: Optional[str] = None
+    ) -> Session:
+        """Drop any existing state for the session and recreate it under one lock."""
+        with self._lock:
+            self._drop_session(session_id)
+            return self._init_session(session_id, active_agent_id, scenario_id)
+
+    def _init_session(
+        self, session_id: str, active_agent_id: str, scenario_id: Optional[str]
+    ) -> Session:
+        # Caller must hold self._lock
+        now = int(time.time() * 1000)
+        sess = Session(
+            session_id=session_id,
+            active_agent_id=active_agent_id,
+            scenario_id=scenario_id,
+            created_ms=now,
+            updated_ms=now,
+        )
+        self._sessions[session_id] = sess
+        self._events[session_id] = []
+        self._seq[session_id] = 0
+        self._idempotency[session_id] = {}
+        self._idem_responses[session_id] = {}
+        self._usage[session_id] = {
+            "requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "total_tokens": 0,
+        }
+        return sess
+
+    def _drop_session(self, session_id: str) -> None:
+        # Caller must hold self._lock
+        self._sessions.pop(session_id, None)
+        self._events.pop(session_id, None)
+        self._seq.pop(session_id, None)
+        self._idempotency.pop(session_id, None)
+        self._idem_responses.pop(session_id, None)
+        self._usage.pop(session_id, None)
+        self._context.pop(session_id, None)
+        self._listeners.pop(session_id, None)
+
     def get_session(self, session_id: str) -> Optional[Session]:
         return self._sessions.get(session_id)
 
@@ -72,7 +103,26 @@ class InMemorySessionStore(SessionStore):
             # keep updated timestamp
             if session_id in self._sessions:
                 self._sessions[session_id].updated_ms = int(time.time() * 1000)
-            return event
+            listeners = tuple(self._listeners.get(session_id, ()))
+        for notify in listeners:
+            try:
+                notify()
+            except Exception:
+                # e.g. a stream whose event loop has closed; never fail the append
+                pass
+        return event
+
+    def subscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        with self._lock:
+            self._listeners.setdefault(session_id, []).append(notify)
+
+    def unsubscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        with self._lock:
+            fns = self._listeners.get(session_id)
+            if fns and notify in fns:
+                fns.remove(notify)
+                if not fns:
+                    del self._listeners[session_id]
 
     def list_events(
         self,
@@ -87,26 +137,45 @@ class InMemorySessionStore(SessionStore):
             items = items[:limit]
         return items
 
+    def find_last_event(
+        self, session_id: str, since_seq: int, type: str
+    ) -> Optional[Event]:
+        """Return the newest event of ``type`` with seq > since_seq, or None."""
+        for ev in reversed(self._events.get(session_id, [])):
+            if ev.seq <= since_seq:
+                return None
+            if ev.type == type:
+                return ev
+        return None
+
     def get_by_client_message_id(
         self, session_id: str, client_message_id: str
     ) -> Optional[Event]:
         return self._idempotency.get(session_id, {}).get(client_message_id)
 
     def remember_client_message(
-        self, session_id: str, client_message_id: str, event: Event
+        self,
+        session_id: str,
+        client_message_id: str,
+        event: Event,
+        response: Optional[bytes] = None,
     ) -> None:
         if session_id not in self._idempotency:
             self._idempotency[session_id] = {}
         self._idempotency[session_id][client_message_id] = event
+        if response is not None:
+            self._idem_responses.setdefault(session_id, {})[
+                client_message_id
+            ] = response
+
+    def get_cached_response(
+        self, session_id: str, client_message_id: str
+    ) -> Optional[bytes]:
+        return self._idem_responses.get(session_id, {}).get(client_message_id)
 
     def delete_session(self, session_id: str) -> None:
         with self._lock:
-            self._sessions.pop(session_id, None)
-            self._events.pop(session_id, None)
-            self._seq.pop(session_id, None)
-            self._idempotency.pop(session_id, None)
-            self._usage.pop(session_id, None)
-            self._context.pop(session_id, None)
+            self._drop_session(session_id)
 
     # ---- Usage aggregation helpers ----
     def add_usage(
@@ -11,7 +11,7 @@ Contract:
 - Idempotency map per session (HSET session:{id}:idem {client_message_id} event_json)
 """
 
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from ..models.event import Event
 from ..models.session import Session
@@ -44,6 +44,14 @@ class RedisSessionStore(SessionStore):
         # TODO: ZADD session:{id}:events with score=seq, value=event.json()
         raise NotImplementedError
 
+    def subscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        # TODO: SUBSCRIBE session:{id}:appended (PUBLISH from append_event)
+        raise NotImplementedError
+
+    def unsubscribe(self, session_id: str, notify: Callable[[], None]) -> None:
+        # TODO: UNSUBSCRIBE session:{id}:appended
+        raise NotImplementedError
+
     def list_events(
         self,
         session_id: str,
@@ -53,6 +61,12 @@ class RedisSessionStore(SessionStore):
         # TODO: ZRANGEBYSCORE with (since_seq, +inf]
         raise NotImplementedError
 
+    def find_last_event(
+        self, session_id: str, since_seq: int, type: str
+    ) -> Optional[Event]:
+        # TODO: ZREVRANGEBYSCORE (since_seq, +inf] and return first matching type
+        raise NotImplementedError
+
     def get_by_client_message_id(
         self, session_id: str, client_message_id: str
     ) -> Optional[Event]:
@@ -60,7 +74,24 @@ class RedisSessionStore(SessionStore):
         raise NotImplementedError
 
     def remember_client_message(
-        self, session_id: str, client_message_id: str, event: Event
+        self,
+        session_id: str,
+        client_message_id: str,
+        event: Event,
+        response: Optional[bytes] = None,
     ) -> None:
         # TODO: HSET session:{id}:idem {client_message_id} event.json()
+        # and HSET session:{id}:idem:resp {client_message_id} response when provided
+        raise NotImplementedError
+
+    def get_cached_response(
+        self, session_id: str, client_message_id: str
+    ) -> Optional[bytes]:
+        # TODO: HGET session:{id}:idem:resp {client_message_id}
+        raise NotImplementedError
+
+    def reset_session(
+        self, session_id: str, active_agent_id: str, scenario_id: Optional[str] = None
+    ) -> Session:
+        # TODO: MULTI; DEL session:{id}* keys; HSET session metadata; EXEC
         raise NotImplementedError
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -11,6 +12,11 @@ TICKETS: List[Dict[str, Any]] = []
 PROJECTS: List[Dict[str, Any]] = []
 JOURNAL: List[Dict[str, Any]] = []
 
+# Catalog price index (rebuilt by load_all): CATALOG positions ordered by price
+# (stable, so ties keep catalog order) and the matching sorted prices for bisect
+_PRICE_ORDER: List[int] = []
+_SORTED_PRICES: List[float] = []
+
 
 def _load_json(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
@@ -26,6 +32,14 @@ def load_all(data_dir: str | Path) -> None:
     ORDERS = _load_json(base / "orders.json")
     TICKETS = _load_json(base / "tickets.json")
     PROJECTS = _load_json(base / "projects.json")
+    _index_catalog()
+
+
+def _index_catalog() -> None:
+    global _PRICE_ORDER, _SORTED_PRICES
+    prices = [float(it.get("price", 0)) for it in CATALOG]
+    _PRICE_ORDER = sorted(range(len(prices)), key=prices.__getitem__)
+    _SORTED_PRICES = [prices[i] for i in _PRICE_ORDER]
 
 
 def find_order(order_id: str) -> Dict[str, Any] | None:
@@ -112,7 +126,27 @@ def search_catalog(
     page_size: int = 10,
 ) -> Dict[str, Any]:
     q = (query or "").strip().lower()
-    items = CATALOG[:]
+    f = filters or {}
+    s = (sort or "").lower()
+    price_asc = s in ("price_asc", "price")
+    # Numeric filters: range-select from the price index instead of scanning
+    pmin = f.get("price_min")
+    pmax = f.get("price_max")
+    if pmin is not None or pmax is not None or price_asc:
+        if len(_PRICE_ORDER) != len(CATALOG):
+            _index_catalog()
+        lo = 0 if pmin is None else bisect_left(_SORTED_PRICES, float(pmin))
+        hi = (
+            len(_SORTED_PRICES)
+            if pmax is None
+            else bisect_right(_SORTED_PRICES, float(pmax))
+        )
+        pos = _PRICE_ORDER[lo:hi]
+        if not price_asc:
+            pos.sort()  # back to catalog order
+        items = [CATALOG[i] for i in pos]
+    else:
+        items = CATALOG[:]
     if q:
         items = [
             it
@@ -121,7 +155,6 @@ def search_catalog(
             or q in str(it.get("category", "")).lower()
             or q in str(it.get("brand", "")).lower()
         ]
-    f = filters or {}
     cat = f.get("category")
     if cat:
         items = [it for it in items if str(it.get("category")) == str(cat)]
@@ -133,18 +166,8 @@ def search_catalog(
             for it in items
             if set(str(x).lower() for x in (it.get("tags") or [])).intersection(tset)
         ]
-    # Numeric filters
-    pmin = f.get("price_min")
-    pmax = f.get("price_max")
-    if pmin is not None:
-        items = [it for it in items if float(it.get("price", 0)) >= float(pmin)]
-    if pmax is not None:
-        items = [it for it in items if float(it.get("price", 0)) <= float(pmax)]
-    # Sorting
-    s = (sort or "").lower()
-    if s in ("price_asc", "price"):
-        items.sort(key=lambda it: float(it.get("price", 0)))
-    elif s == "price_desc":
+    # Sorting (price ascending already follows from the index order)
+    if s == "price_desc":
         items.sort(key=lambda it: float(it.get("price", 0)), reverse=True)
     elif s == "rating_desc":
         items.sort(key=lambda it: float(it.get("rating", 0)), reverse=True)
@@ -69,7 +69,9 @@ async def tools_list():
     for k, spec in tool_registry.items():
         desc = spec.description or None
         items.append(
-            ToolListItem(name=k, description=desc, params=(spec.params_schema or None))
+            ToolListItem(
+                name=k, description=desc, params=(dict(spec.params_schema) or None)
+            )
         )
     return items
 
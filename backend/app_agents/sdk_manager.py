@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import functools
 import logging
+from contextvars import ContextVar
 from typing import Any, Dict
 
 # Direct Agents SDK import only
@@ -77,7 +80,7 @@ from . import mock_data as _mock
 from .core.models.event import Event
 from .core.store.memory_store import store
 from .registry import get_scenario
-from .tools import tool_registry
+from .tools import roles_to_mask, tool_registry
 
 # In-memory map of active sessions to SQLiteSession objects (file-backed optional later)
 # SQLiteSession may be unavailable; store as generic values
@@ -101,6 +104,33 @@ AGENT_TOOL_ROLE_ALLOWLIST: Dict[str, list[str]] = {
     ],
 }
 
+
+def _agent_tool_gate(agent_name: str):
+    """Build the is_enabled callback for an agent-as-tool.
+
+    The allowlist is frozen once per build so each check is a C-level
+    isdisjoint. Defaults to enabled when no roles are provided to make the
+    feature work out-of-the-box; can be restricted by setting context.roles to
+    a list that omits the agent name and the special "agents" flag.
+    """
+    allow = frozenset(AGENT_TOOL_ROLE_ALLOWLIST.get(agent_name) or ())
+
+    def _is_enabled(ctx: Any | None = None, _agent: Any | None = None) -> bool:
+        try:
+            roles = (ctx or {}).get("roles") or ()
+            # If there's a specific allowlist configured for this agent, enforce it
+            if allow:
+                return not allow.isdisjoint(roles)
+            # If no roles provided, default to enabled for better UX
+            if not roles:
+                return True
+            return agent_name in roles or "agents" in roles
+        except Exception:
+            return True
+
+    return _is_enabled
+
+
 # Load mock data once when module is imported (idempotent)
 try:
     import os
@@ -196,6 +226,7 @@ def _resolve_agent_tools(
             tools.append(b)
 
     # Then: include custom registry functions
+    sess_role_mask = roles_to_mask((session_context or {}).get("roles"))
     for n in names or []:
         if function_tool is None:
             break
@@ -203,19 +234,18 @@ def _resolve_agent_tools(
         if not spec:
             continue
         # Dynamic gating by roles if specified on the tool spec
-        try:
-            roles_allowed = getattr(spec, "roles_allowed", []) or []
-        except Exception:
-            roles_allowed = []
-        if roles_allowed:
-            sess_roles = set((session_context or {}).get("roles", []) or [])
-            if not sess_roles.intersection(set(roles_allowed)):
-                # Skip tool if no intersection between session roles and allowed roles
-                continue
+        if not spec.allows(sess_role_mask):
+            # Skip tool if no intersection between session roles and allowed roles
+            continue
         # Try modern signature first; fall back to variants while preserving schema
         # If infer_schema is True, let SDK derive from signature; else pass provided schema
         infer = getattr(spec, "infer_schema", True)
-        params = None if infer else (spec.params_schema or None)
+        # Registry schemas are read-only and shared; hand the SDK its own copy
+        params = (
+            None
+            if infer or not spec.params_schema
+            else copy.deepcopy(dict(spec.params_schema))
+        )
         try:
             ft = function_tool(
                 spec.func,
@@ -445,13 +475,33 @@ def build_agent_network_for_viz(scenario_id: str, root_agent: str | None = None)
     return root_agent_obj, name_to_agent
 
 
+# Session that handoff callbacks of the (shared, cached) network report to; set by
+# build_agent_network_for_runtime in the caller's context before each run
+_handoff_session: ContextVar[str] = ContextVar("handoff_session", default="")
+
+
 def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = None):
     """Construct a name->Agent mapping with tools, native handoffs, and agents-as-tools.
     - Applies handoff prompt to agents that can handoff.
     - Uses session context for tool gating.
     - Adds on_handoff callback that logs a handoff event (UI can apply/dismiss).
     - Exposes other agents as tools to the orchestrator (supervisor or default_root).
+    Networks depend only on the scenario and the session roles, so they are built
+    once per (scenario_id, roles) and shared; see clear_agent_network_cache().
     """
+    session_context = store.get_context(session_id) if session_id else {}
+    roles = tuple(sorted({r for r in (session_context.get("roles") or []) if r}))
+    _handoff_session.set(session_id or "")
+    return dict(_build_agent_network(scenario_id, roles))
+
+
+def clear_agent_network_cache() -> None:
+    """Drop memoized networks (call after scenario definitions or SDK globals change)."""
+    _build_agent_network.cache_clear()
+
+
+@functools.lru_cache(maxsize=128)
+def _build_agent_network(scenario_id: str, roles: tuple[str, ...]) -> Dict[str, Any]:
     sc = get_scenario(scenario_id)
     if not sc:
         return {}
@@ -462,7 +512,7 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
     except Exception:
         return {}
 
-    session_context = store.get_context(session_id) if session_id else {}
+    session_context: Dict[str, Any] = {"roles": list(roles)}
 
     # First pass: create agents with tools and (if applicable) handoff prompt
     name_to_agent: Dict[str, Any] = {}
@@ -505,7 +555,7 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
             def _make_cb(target: str):
                 def _cb(input: Any | None = None):
                     try:
-                        sid = session_id or ""
+                        sid = _handoff_session.get()
                         seq = store.next_seq(sid) if sid else 0
                         # Try to extract recommended prompts if present in SDK handoff input
                         rec_prompts = None
@@ -599,27 +649,6 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
                 tgt = name_to_agent.get(ad.name)
                 if not tgt:
                     continue
-
-                def _is_enabled(ctx: Any | None = None, agent_name: str = ad.name):
-                    """Gate agent-as-tool availability by session context roles.
-                    Defaults to enabled when no roles are provided to make the
-                    feature work out-of-the-box; can be restricted by setting
-                    context.roles to a list that omits the agent name and the
-                    special "agents" flag.
-                    """
-                    try:
-                        roles = set(((ctx or {}).get("roles") or []))
-                        # If there's a specific allowlist configured for this agent, enforce it
-                        allow = AGENT_TOOL_ROLE_ALLOWLIST.get(agent_name)
-                        if isinstance(allow, list) and allow:
-                            return bool(roles.intersection(set(allow)))
-                        # If no roles provided, default to enabled for better UX
-                        if not roles:
-                            return True
-                        return agent_name in roles or "agents" in roles
-                    except Exception:
-                        return True
-
                 try:
                     tool_name = f"{ad.name}_agent_tool"
                     tool_desc = (
@@ -631,7 +660,7 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
                         tgt.as_tool(
                             tool_name=tool_name,
                             tool_description=tool_desc,
-                            is_enabled=_is_enabled,
+                            is_enabled=_agent_tool_gate(ad.name),
                         )
                     )
                 except Exception:
@@ -659,19 +688,6 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
                 tgt = name_to_agent.get(ad.name)
                 if not tgt:
                     continue
-
-                def _is_enabled_root(ctx: Any | None = None, agent_name: str = ad.name):
-                    try:
-                        roles = set(((ctx or {}).get("roles") or []))
-                        allow = AGENT_TOOL_ROLE_ALLOWLIST.get(agent_name)
-                        if isinstance(allow, list) and allow:
-                            return bool(roles.intersection(set(allow)))
-                        if not roles:
-                            return True
-                        return agent_name in roles or "agents" in roles
-                    except Exception:
-                        return True
-
                 try:
                     tool_name = f"{ad.name}_agent_tool"
                     tool_desc = (
@@ -683,7 +699,7 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
                         tgt.as_tool(
                             tool_name=tool_name,
                             tool_description=tool_desc,
-                            is_enabled=_is_enabled_root,
+                            is_enabled=_agent_tool_gate(ad.name),
                         )
                     )
                 except Exception:
@@ -700,6 +716,14 @@ def build_agent_network_for_runtime(scenario_id: str, session_id: str | None = N
     except Exception:
         pass
 
+    # Name -> tool index next to each agent's tool list for O(1) lookups
+    for agent in name_to_agent.values():
+        try:
+            agent.tools_by_name = {
+                getattr(t, "name", ""): t for t in (getattr(agent, "tools", None) or [])
+            }
+        except AttributeError:
+            pass
     return name_to_agent
 
 
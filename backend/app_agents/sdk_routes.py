@@ -2,13 +2,23 @@ from __future__ import annotations
 
 import asyncio
 import base64
+import functools
+import gzip
+import hashlib
 import logging
+import os
+import shutil
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
 from uuid import uuid4
 
+import orjson
 from fastapi import APIRouter, Body, HTTPException, Query
-from fastapi.responses import JSONResponse, StreamingResponse
-from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
 
 from . import sdk_manager
 ## Removed Responses fallback; SDK-only execution path.
@@ -16,6 +26,15 @@ from .core.models.event import Event
 from .core.store.memory_store import store
 from .tools import tool_registry
 
+# Optional: SIMD base64 encoder (pybase64); falls back to binascii directly, which
+# skips the Python-level base64.b64encode wrapper (partial is C-implemented)
+try:  # pragma: no cover - import is runtime-optional
+    from pybase64 import b64encode as _b64  # type: ignore
+except Exception:  # pragma: no cover
+    from binascii import b2a_base64
+
+    _b64 = functools.partial(b2a_base64, newline=False)
+
 # Optional: import tracing context manager from Agents SDK; fallback to no-op
 try:  # pragma: no cover - import is runtime-optional
     from agents import trace  # type: ignore
@@ -27,7 +46,14 @@ except Exception:  # pragma: no cover
         yield
 
 
-router = APIRouter()
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (faster, native datetime/UUID support)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+router = APIRouter(default_response_class=ORJSONResponse)
 logger = logging.getLogger(__name__)
 
 
@@ -51,7 +77,7 @@ async def sdk_tools_catalog(roles: str | None = Query(None)):
                     "name": name,
                     "description": getattr(spec, "description", "") or "",
                     "roles_allowed": allowed,
-                    "schema": getattr(spec, "params_schema", {}),
+                    "schema": dict(getattr(spec, "params_schema", {})),
                     # Example args are optional; FE may construct from schema
                     "example_args": {},
                 }
@@ -201,14 +227,21 @@ class SDKSessionMessageRequest(BaseModel):
 
 @router.post("/sdk/session/message")
 async def sdk_session_message(req: SDKSessionMessageRequest):
-    if not req.user_input.strip():
+    # isspace() stops at the first non-space char; strip() would copy the whole input
+    if not req.user_input or req.user_input.isspace():
         raise HTTPException(status_code=400, detail="user_input cannot be empty")
+    ui_len = len(req.user_input)
+    # Idempotent replay: serve the pre-rendered body before touching the store
+    if req.client_message_id:
+        cached = store.get_cached_response(req.session_id, req.client_message_id)
+        if cached:
+            return Response(cached, media_type="application/json")
     agent_spec = req.agent or {}
     try:
         logger.info(
             "/sdk/session/message start sid=%s len=%s",
             req.session_id,
-            len(req.user_input),
+            ui_len,
         )
         if req.client_message_id:
             prior = store.get_by_client_message_id(
@@ -399,17 +432,15 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
                 suggestion_target: str | None = None
                 try:
                     # Inspect only events emitted during this hop
-                    recent = store.list_events(
-                        req.session_id, since_seq=last_seq_before
+                    sugg = store.find_last_event(
+                        req.session_id, last_seq_before, "handoff_suggestion"
                     )
-                    for ev in reversed(recent):
-                        if ev.type == "handoff_suggestion":
-                            # Use data.agent_from if available; fallback to current
-                            data = getattr(ev, "data", None) or {}
-                            target = data.get("to_agent") or ev.agent_id
-                            if target and isinstance(target, str):
-                                suggestion_target = target
-                                break
+                    if sugg is not None:
+                        # Use data.to_agent if available; fallback to the event agent
+                        data = getattr(sugg, "data", None) or {}
+                        target = data.get("to_agent") or sugg.agent_id
+                        if target and isinstance(target, str):
+                            suggestion_target = target
                 except Exception:
                     suggestion_target = None
 
@@ -521,7 +552,8 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
                         scenario_id=req.scenario_id,
                     )
                     if (summ_res.get("final_output") or "").strip():
-                        result = {**result, **summ_res, "used_fallback": True}
+                        result.update(summ_res)
+                        result["used_fallback"] = True
                 except Exception:
                     # If summarizer fails, keep empty result; assistant event will show empty text (still appended)
                     pass
@@ -535,11 +567,8 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
                     "AGENTS_DEFAULT_REPLY",
                     "I couldn't generate a full response this turn, but I did receive your message.",
                 )
-                result = {
-                    **result,
-                    "final_output": default_reply,
-                    "used_fallback": True,
-                }
+                result["final_output"] = default_reply
+                result["used_fallback"] = True
                 seqnt = store.next_seq(req.session_id)
                 store.append_event(
                     req.session_id,
@@ -559,16 +588,8 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
 
         message_id = req.client_message_id or str(uuid4())
         seq = store.next_seq(req.session_id)
-        # Resolve the latest active agent for the assistant event (post-handoff)
-        try:
-            _sess_cur = store.get_session(req.session_id)
-            _agent_for_event = (
-                getattr(_sess_cur, "active_agent_id", None)
-                or locals().get("cur_agent")
-                or agent_spec.get("name", "Assistant")
-            )
-        except Exception:
-            _agent_for_event = agent_spec.get("name", "Assistant")
+        # Latest active agent for the assistant event; cur_agent already reflects applied handoffs
+        _agent_for_event = cur_agent or agent_spec.get("name", "Assistant")
         asst_event = Event(
             session_id=req.session_id,
             seq=seq,
@@ -581,10 +602,6 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
             timestamp_ms=int(time.time() * 1000),
         )
         store.append_event(req.session_id, asst_event)
-        if req.client_message_id:
-            store.remember_client_message(
-                req.session_id, req.client_message_id, asst_event
-            )
 
         try:
             seq1 = store.next_seq(req.session_id)
@@ -607,7 +624,13 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
             )
         except Exception:
             pass
-        return {**result, "events": [user_event.model_dump(), asst_event.model_dump()]}
+        result["events"] = [user_event.model_dump(), asst_event.model_dump()]
+        body = orjson.dumps(result, default=str)
+        if req.client_message_id:
+            store.remember_client_message(
+                req.session_id, req.client_message_id, asst_event, response=body
+            )
+        return Response(body, media_type="application/json")
     except Exception as e:
         logger.exception("/sdk/session/message error: %s", e)
         try:
@@ -653,6 +676,68 @@ async def sdk_session_message(req: SDKSessionMessageRequest):
         }
 
 
+# Strong refs to streamed turns; the event loop only holds weak refs to tasks
+_turn_tasks: set[asyncio.Task] = set()
+
+
+@contextmanager
+def _appended_signal(session_id: str):
+    """Yield an asyncio.Event that is set whenever the session gets a new event."""
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def _notify() -> None:
+        # append_event may run off-loop (worker threads)
+        loop.call_soon_threadsafe(changed.set)
+
+    store.subscribe(session_id, _notify)
+    try:
+        yield changed
+    finally:
+        store.unsubscribe(session_id, _notify)
+
+
+@router.post("/sdk/session/message/stream")
+async def sdk_session_message_stream(req: SDKSessionMessageRequest):
+    """Run the same turn as /sdk/session/message but stream it as SSE.
+
+    Each session event appended during the turn (turn_start, tool calls/results,
+    handoffs, the assistant message) is sent as a ``data:`` frame as soon as it is
+    stored, so clients can act on the assistant text without waiting for the
+    turn's bookkeeping. The aggregated response body follows as a final
+    ``event: result`` frame.
+    """
+    if not req.user_input or req.user_input.isspace():
+        raise HTTPException(status_code=400, detail="user_input cannot be empty")
+    evs = store.list_events(req.session_id)
+    last = evs[-1].seq if evs else 0
+    # The turn runs independently of the client connection, like the plain route;
+    # _turn_tasks keeps it referenced if the client goes away mid-stream
+    turn = asyncio.create_task(sdk_session_message(req))
+    _turn_tasks.add(turn)
+    turn.add_done_callback(_turn_tasks.discard)
+
+    async def event_gen():
+        nonlocal last
+        with _appended_signal(req.session_id) as changed:
+            turn.add_done_callback(lambda _t: changed.set())
+            while True:
+                done = turn.done()
+                for ev in store.list_events(req.session_id, since_seq=last):
+                    last = ev.seq
+                    payload = orjson.dumps(ev.model_dump(), default=str)
+                    yield b"data: " + payload + b"\n\n"
+                if done:
+                    break
+                await changed.wait()
+                changed.clear()
+        res = turn.result()
+        body = res.body if isinstance(res, Response) else orjson.dumps(res, default=str)
+        yield b"event: result\ndata: " + body + b"\n\n"
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
+
+
 # ---- SDK: Set Active Agent ----
 class SetActiveAgentRequest(BaseModel):
     session_id: str
@@ -716,33 +801,134 @@ async def get_session_usage(session_id: str = Query(...)):
 
 
 # ---- SDK: Events + SSE ----
+# Encoded /events bodies keyed by (session_id, since). An entry is reused while the
+# listed events are unchanged: same count and the very same last Event object
+# (held by reference, so a reset session can never alias it).
+_EVENTS_CACHE_MAX = 256
+_events_cache: OrderedDict[tuple[str, int | None], tuple[int, Any, bytes]] = (
+    OrderedDict()
+)
+
+
+def _events_body(session_id: str, since: int | None) -> bytes:
+    events = store.list_events(session_id, since_seq=since)
+    key = (session_id, since)
+    n = len(events)
+    last = events[-1] if events else None
+    hit = _events_cache.get(key)
+    if hit is not None and hit[0] == n and hit[1] is last:
+        _events_cache.move_to_end(key)
+        return hit[2]
+    body = orjson.dumps([e.model_dump() for e in events], default=str)
+    _events_cache[key] = (n, last, body)
+    if len(_events_cache) > _EVENTS_CACHE_MAX:
+        _events_cache.popitem(last=False)
+    return body
+
+
 @router.get("/sdk/session/{session_id}/events")
 async def list_session_events(session_id: str, since: int | None = Query(None)):
     try:
-        events = store.list_events(session_id, since_seq=since)
-        return [e.model_dump() for e in events]
+        return Response(_events_body(session_id, since), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"events retrieval failed: {e}")
 
 
 @router.get("/sdk/session/{session_id}/stream")
-async def stream_sdk_session_events(session_id: str, since: int | None = Query(None)):
+@router.get("/sdk/session/{session_id}/events/stream")
+async def stream_sdk_session_events(
+    session_id: str,
+    since: int | None = Query(None),
+    until: str | None = Query(
+        None, description="Close the stream after the first event of this type"
+    ),
+):
     async def event_gen():
         last = since or 0
         try:
-            while True:
-                evs = store.list_events(session_id, since_seq=last)
-                if evs:
-                    for ev in evs:
+            # Woken by the store on each append instead of polling on a timer
+            with _appended_signal(session_id) as changed:
+                while True:
+                    changed.clear()
+                    for ev in store.list_events(session_id, since_seq=last):
                         last = max(last, ev.seq)
-                        yield f"data: {ev.model_dump()}\n\n"
-                await asyncio.sleep(0.5)
+                        # One JSON event per SSE frame
+                        payload = orjson.dumps(ev.model_dump(), default=str)
+                        yield b"data: " + payload + b"\n\n"
+                        if until is not None and ev.type == until:
+                            return
+                    await changed.wait()
         except asyncio.CancelledError:
             return
 
     return StreamingResponse(event_gen(), media_type="text/event-stream")
 
 
+# ---- SDK: Batch ----
+# Ops run sequentially server-side; later ops may reference earlier results with
+# "$<index>.<key>" strings (e.g. "$0.session_id"), so a create -> act -> read flow
+# costs one round-trip instead of three.
+class BatchEventsRequest(BaseModel):
+    session_id: str
+    since: int | None = None
+
+
+async def _batch_events(req: BatchEventsRequest) -> list:
+    # Batch results are encoded together, so skip the per-route body cache
+    evs = store.list_events(req.session_id, since_seq=req.since)
+    return [e.model_dump() for e in evs]
+
+
+# op -> (args model, handler); args are validated like the standalone routes' bodies
+_BATCH_OPS = {
+    "create": (SDKSessionCreateRequest, sdk_session_create),
+    "set_active_agent": (SetActiveAgentRequest, set_active_agent),
+    "events": (BatchEventsRequest, _batch_events),
+    "delete": (SDKSessionDeleteRequest, sdk_session_delete),
+}
+
+
+def _resolve_batch_ref(value: Any, results: list) -> Any:
+    if isinstance(value, str) and value.startswith("$"):
+        idx, _, key = value[1:].partition(".")
+        if idx.isdigit():
+            i = int(idx)
+            if i >= len(results):
+                raise HTTPException(
+                    status_code=400, detail=f"batch ref {value} points ahead"
+                )
+            res = results[i]
+            return res.get(key) if key and isinstance(res, dict) else res
+    return value
+
+
+@router.post("/sdk/batch")
+async def sdk_batch(ops: list[dict] = Body(...)):
+    results: list = []
+    for i, raw in enumerate(ops):
+        op = raw.get("op")
+        if not isinstance(op, str):
+            raise HTTPException(
+                status_code=422, detail=f"batch op {i}: 'op' must be a string"
+            )
+        entry = _BATCH_OPS.get(op)
+        if entry is None:
+            raise HTTPException(
+                status_code=400, detail=f"batch op {i}: unknown op {op!r}"
+            )
+        model, fn = entry
+        args = {k: _resolve_batch_ref(v, results) for k, v in raw.items() if k != "op"}
+        try:
+            req = model.model_validate(args)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422,
+                detail=f"batch op {i} ({op}): {e.errors(include_url=False)}",
+            )
+        results.append(await fn(req))
+    return results
+
+
 # ---- SDK: Audio ingestion (placeholder) ----
 class AudioChunkRequest(BaseModel):
     session_id: str
@@ -774,6 +960,147 @@ async def sdk_session_audio(req: AudioChunkRequest):
 
 
 # ---- SDK: Agent visualization ----
+# Rendered base64 payloads keyed by (DOT signature, format); bounded LRU
+_VIZ_CACHE_MAX = 64
+_viz_cache: "OrderedDict[tuple[str, str], str]" = OrderedDict()
+
+
+# agents.extensions.visualization.draw_graph, resolved on first use; import errors are sticky
+_draw_graph = None
+_DRAW_GRAPH_ERR: Exception | None = None
+
+
+def _get_draw_graph():
+    global _draw_graph, _DRAW_GRAPH_ERR
+    if _draw_graph is None and _DRAW_GRAPH_ERR is None:
+        try:
+            from agents.extensions.visualization import draw_graph  # type: ignore
+
+            _draw_graph = draw_graph
+        except Exception as e:
+            _DRAW_GRAPH_ERR = e
+    return _draw_graph
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_dot_available() -> str:
+    """Locate the Graphviz 'dot' binary once per process (Windows/conda friendly).
+
+    Returns the discovered path, or "" when none was found. A hit outside PATH is
+    exported via GRAPHVIZ_DOT so the graphviz package can pick it up.
+    """
+    try:
+        # If already on PATH or GRAPHVIZ_DOT is set and exists, we're good
+        on_path = shutil.which("dot")
+        if on_path:
+            return on_path
+        dot_env = os.environ.get("GRAPHVIZ_DOT")
+        if dot_env and os.path.exists(dot_env):
+            return dot_env
+        # Try conda prefix locations
+        conda = os.environ.get("CONDA_PREFIX")
+        candidates: list[str] = []
+        if conda:
+            candidates.extend(
+                [
+                    os.path.join(conda, "Library", "bin", "dot.exe"),
+                    os.path.join(conda, "Library", "bin", "graphviz", "dot.exe"),
+                    os.path.join(conda, "bin", "dot"),
+                ]
+            )
+        # Common Windows installs
+        candidates.extend(
+            [
+                r"C:\\Program Files\\Graphviz\\bin\\dot.exe",
+                r"C:\\Program Files (x86)\\Graphviz2.38\\bin\\dot.exe",
+            ]
+        )
+        for p in candidates:
+            if os.path.exists(p):
+                os.environ["GRAPHVIZ_DOT"] = p
+                return p
+    except Exception:
+        return ""
+    return ""
+
+
+def _render_dot(dot_source: str, fmt: str) -> bytes:
+    """Render DOT source with Graphviz (``pipe`` runs the ``dot`` subprocess)."""
+    import graphviz  # type: ignore
+
+    return graphviz.Source(dot_source).pipe(format=fmt)
+
+
+async def _pipe_payload(
+    g, fmt: str, sig: str | None, *, inline: bool = False, compress: bool = False
+) -> str:
+    """Render ``g`` to ``fmt``, memoized by DOT signature.
+
+    Returns base64 text by default; the decoded document itself when ``inline``
+    (SVG only); or base64 of the gzip-compressed bytes when ``compress``.
+    """
+    variant = f"{fmt}:inline" if inline else f"{fmt}:gzip" if compress else fmt
+    key = (sig, variant) if sig else None
+    if key is not None:
+        hit = _viz_cache.get(key)
+        if hit is not None:
+            _viz_cache.move_to_end(key)
+            return hit
+    dot_src = getattr(g, "source", None)
+    if isinstance(dot_src, str):
+        # dot already runs as a subprocess; a thread just keeps the wait off the loop
+        b = await asyncio.to_thread(_render_dot, dot_src, fmt)
+    else:
+        g.format = fmt  # type: ignore[attr-defined]
+        b = await asyncio.to_thread(g.pipe, format=fmt)  # type: ignore[call-arg]
+    if inline:
+        payload = b.decode("utf-8")
+    elif compress:
+        # Level 1 is nearly free and captures most of the win on SVG/XML
+        payload = _b64(memoryview(gzip.compress(b, compresslevel=1))).decode("ascii")
+    else:
+        payload = _b64(memoryview(b)).decode("ascii")
+    if key is not None:
+        _viz_cache[key] = payload
+        if len(_viz_cache) > _VIZ_CACHE_MAX:
+            _viz_cache.popitem(last=False)
+    return payload
+
+
+async def _dot_dump_hint(g, err: Exception) -> str:
+    """Write the graph's DOT source to disk for troubleshooting and return a hint.
+
+    Render failures usually mean the Graphviz system binaries are missing.
+    """
+    try:
+        backend_dir = os.path.dirname(os.path.dirname(__file__))
+        out_root = os.path.join(backend_dir, "agent_graph_out")
+        # If a file exists with this name, fallback to backend_dir
+        if os.path.exists(out_root) and not os.path.isdir(out_root):
+            out_root = backend_dir
+        os.makedirs(out_root, exist_ok=True)
+        dot_path = os.path.join(out_root, f"agent_graph_{uuid4().hex}.dot")
+        # graphviz.Digraph exposes 'source'
+        dot_src = getattr(g, "source", None)
+        if not isinstance(dot_src, str):
+            try:
+                dot_src = str(g)
+            except Exception:
+                dot_src = "// (no source available)"
+        # Binary write off the event loop (no text-mode wrapper / newline translation)
+        await asyncio.to_thread(
+            Path(dot_path).write_bytes, (dot_src or "").encode("utf-8")
+        )
+        # Try to include discovered dot path in hint
+        dot_hint = os.environ.get("GRAPHVIZ_DOT") or "dot (not found)"
+        return (
+            f"viz render failed: {err}; wrote DOT to {dot_path}. "
+            f"Set GRAPHVIZ_DOT to a valid dot.exe or install Graphviz and add it to PATH. Using: {dot_hint}"
+        )
+    except Exception as ewrite:
+        return f"viz render failed: {err}; additionally failed to write DOT: {ewrite}"
+
+
 class VizRequest(BaseModel):
     scenario_id: str = Field(...)
     root_agent: str | None = Field(None, description="Optional root agent name for viz")
@@ -785,7 +1112,19 @@ class VizRequest(BaseModel):
         description="If true, include DOT source in response (no Graphviz needed)",
     )
     output_format: str | None = Field(
-        None, description="Preferred output format: 'svg' or 'png'"
+        "svg", description="Preferred output format: 'svg' (default) or 'png'"
+    )
+    inline_svg: bool = Field(
+        False,
+        description="If true and the format is SVG, return the markup as 'svg' text instead of 'image_base64'",
+    )
+    compress_svg: bool = Field(
+        False,
+        description="If true and the format is SVG, gzip before base64 (format 'svgz', encoding 'gzip+base64')",
+    )
+    fallback: bool = Field(
+        False,
+        description="If true, retry as PNG when rendering the requested format fails",
     )
 
 
@@ -797,59 +1136,16 @@ async def visualize_agents(req: VizRequest):
         )
         if not root:
             # Return ok:false with a helpful message rather than 400 to avoid noisy UI errors
-            return JSONResponse(
-                {
-                    "ok": False,
-                    "error": "No scenario/agents to visualize",
-                    "scenario_id": req.scenario_id,
-                },
-                status_code=200,
+            return {
+                "ok": False,
+                "error": "No scenario/agents to visualize",
+                "scenario_id": req.scenario_id,
+            }
+        draw_graph = _get_draw_graph()
+        if draw_graph is None:
+            raise HTTPException(
+                status_code=500, detail=f"viz unavailable: {_DRAW_GRAPH_ERR}"
             )
-        try:
-            from agents.extensions.visualization import \
-                draw_graph  # type: ignore
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"viz unavailable: {e}")
-
-        # Helper: attempt to ensure Graphviz 'dot' is discoverable on Windows/conda
-        def _ensure_dot_available() -> str | None:
-            try:
-                import os
-                import shutil
-
-                # If already on PATH or GRAPHVIZ_DOT is set and exists, we're good
-                if shutil.which("dot"):
-                    return None
-                dot_env = os.environ.get("GRAPHVIZ_DOT")
-                if dot_env and os.path.exists(dot_env):
-                    return dot_env
-                # Try conda prefix locations
-                conda = os.environ.get("CONDA_PREFIX")
-                candidates: list[str] = []
-                if conda:
-                    candidates.extend(
-                        [
-                            os.path.join(conda, "Library", "bin", "dot.exe"),
-                            os.path.join(
-                                conda, "Library", "bin", "graphviz", "dot.exe"
-                            ),
-                            os.path.join(conda, "bin", "dot"),
-                        ]
-                    )
-                # Common Windows installs
-                candidates.extend(
-                    [
-                        r"C:\\Program Files\\Graphviz\\bin\\dot.exe",
-                        r"C:\\Program Files (x86)\\Graphviz2.38\\bin\\dot.exe",
-                    ]
-                )
-                for p in candidates:
-                    if os.path.exists(p):
-                        os.environ["GRAPHVIZ_DOT"] = p
-                        return p
-            except Exception:
-                return None
-            return None
 
         _ensure_dot_available()
 
@@ -866,29 +1162,51 @@ async def visualize_agents(req: VizRequest):
             dot_payload = {"dot_source": dot_src}
         else:
             dot_payload = {}
-        # Prefer requested format; else SVG for crisp scaling; fallback to PNG
+        # Identical agent topologies produce identical DOT; key the render cache on it
+        try:
+            dot_sig = hashlib.blake2b(
+                g.source.encode("utf-8"), digest_size=16
+            ).hexdigest()
+        except Exception:
+            dot_sig = None
+        # Prefer requested format; else SVG for crisp scaling; PNG retry only on opt-in.
+        # Image payloads are returned as ORJSONResponse directly so FastAPI skips the
+        # jsonable_encoder pass over the (potentially megabyte-sized) base64 string.
         try:
             if getattr(req, "output_format", None) in {"png", "svg"}:
                 fmt = req.output_format
-                g.format = fmt  # type: ignore[attr-defined]
-                b = g.pipe(format=fmt)  # type: ignore[call-arg]
-                payload = base64.b64encode(b).decode("ascii")
-                return JSONResponse(
-                    {"ok": True, "format": fmt, "image_base64": payload, **dot_payload}
+            else:
+                # Default try SVG first
+                fmt = "svg"
+            if fmt == "svg" and req.inline_svg:
+                # SVG is already text: ship it verbatim rather than base64 (+33% size)
+                svg_text = await _pipe_payload(g, "svg", dot_sig, inline=True)
+                return ORJSONResponse(
+                    {"ok": True, "format": "svg", "svg": svg_text, **dot_payload}
                 )
-            # Default try SVG first
-            g.format = "svg"  # type: ignore[attr-defined]
-            svg_bytes = g.pipe(format="svg")  # type: ignore[call-arg]
-            payload = base64.b64encode(svg_bytes).decode("ascii")
-            return JSONResponse(
-                {"ok": True, "format": "svg", "image_base64": payload, **dot_payload}
+            if fmt == "svg" and req.compress_svg:
+                # SVG compresses 3-5x; clients inflate after base64-decoding
+                payload = await _pipe_payload(g, "svg", dot_sig, compress=True)
+                return ORJSONResponse(
+                    {
+                        "ok": True,
+                        "format": "svgz",
+                        "encoding": "gzip+base64",
+                        "image_base64": payload,
+                        **dot_payload,
+                    }
+                )
+            payload = await _pipe_payload(g, fmt, dot_sig)
+            return ORJSONResponse(
+                {"ok": True, "format": fmt, "image_base64": payload, **dot_payload}
             )
-        except Exception as e_svg:
+        except Exception as e_render:
+            if not req.fallback:
+                # PNG retry is opt-in; report the failure with a DOT dump instead
+                return {"ok": False, "error": await _dot_dump_hint(g, e_render)}
             try:
-                g.format = "png"  # type: ignore[attr-defined]
-                png_bytes = g.pipe(format="png")  # type: ignore[call-arg]
-                payload = base64.b64encode(png_bytes).decode("ascii")
-                return JSONResponse(
+                payload = await _pipe_payload(g, "png", dot_sig)
+                return ORJSONResponse(
                     {
                         "ok": True,
                         "format": "png",
@@ -902,42 +1220,11 @@ async def visualize_agents(req: VizRequest):
                 try:
                     g.render(filename=req.filename or "agent_graph", format="png", cleanup=True)  # type: ignore[call-arg]
                 except Exception as e2:
-                    # Write DOT source to a safe path for troubleshooting (usually missing Graphviz system binaries)
-                    try:
-                        import os
-                        from uuid import uuid4 as _uuid4
-
-                        backend_dir = os.path.dirname(os.path.dirname(__file__))
-                        out_root = os.path.join(backend_dir, "agent_graph_out")
-                        # If a file exists with this name, fallback to backend_dir
-                        if os.path.exists(out_root) and not os.path.isdir(out_root):
-                            out_root = backend_dir
-                        os.makedirs(out_root, exist_ok=True)
-                        dot_path = os.path.join(
-                            out_root, f"agent_graph_{_uuid4().hex}.dot"
-                        )
-                        # graphviz.Digraph exposes 'source'
-                        dot_src = getattr(g, "source", None)
-                        if not isinstance(dot_src, str):
-                            try:
-                                dot_src = str(g)
-                            except Exception:
-                                dot_src = "// (no source available)"
-                        with open(dot_path, "w", encoding="utf-8") as f:
-                            f.write(dot_src or "")
-                        # Try to include discovered dot path in hint
-                        dot_hint = os.environ.get("GRAPHVIZ_DOT") or "dot (not found)"
-                        hint = (
-                            f"viz render failed: {e2}; wrote DOT to {dot_path}. "
-                            f"Set GRAPHVIZ_DOT to a valid dot.exe or install Graphviz and add it to PATH. Using: {dot_hint}"
-                        )
-                    except Exception as ewrite:
-                        hint = f"viz render failed: {e2}; additionally failed to write DOT: {ewrite}"
-                    return JSONResponse({"ok": False, "error": hint}, status_code=200)
+                    return {"ok": False, "error": await _dot_dump_hint(g, e2)}
                 try:
                     with open(fname, "rb") as f:
-                        payload = base64.b64encode(f.read()).decode("ascii")
-                    return JSONResponse(
+                        payload = _b64(memoryview(f.read())).decode("ascii")
+                    return ORJSONResponse(
                         {
                             "ok": True,
                             "format": "png",
@@ -946,14 +1233,9 @@ async def visualize_agents(req: VizRequest):
                         }
                     )
                 except Exception as e3:
-                    return JSONResponse(
-                        {"ok": False, "error": f"viz read failed: {e3}"},
-                        status_code=200,
-                    )
+                    return {"ok": False, "error": f"viz read failed: {e3}"}
     except HTTPException:
         raise
     except Exception as e:
         # Return ok:false as JSON to help the UI
-        return JSONResponse(
-            {"ok": False, "error": f"visualize failed: {e}"}, status_code=200
-        )
+        return {"ok": False, "error": f"visualize failed: {e}"}
@@ -1,11 +1,33 @@
 from __future__ import annotations
 
+import functools
+import inspect
 import logging
 import os
-from typing import Any, Callable, Dict, List, Optional
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    TypeVar,
+    get_args,
+    get_type_hints,
+)
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import ConfigDict, Field, TypeAdapter, create_model
 
 from . import mock_data
 
@@ -16,19 +38,28 @@ try:
 except Exception:  # pragma: no cover
     create_client = None  # type: ignore
 
+try:
+    # Compiles JSON Schema into generated Python validators (optional)
+    import fastjsonschema  # type: ignore
+except Exception:  # pragma: no cover
+    fastjsonschema = None  # type: ignore
+
 try:
     # Context wrapper from Agents SDK for ctx-aware tools
     from agents import RunContextWrapper  # type: ignore
 except Exception:  # pragma: no cover - fallback typing if SDK unavailable
 
-    class RunContextWrapper(BaseModel):  # type: ignore
-        context: Dict[str, Any] = {}
+    _TContext = TypeVar("_TContext")
+
+    class RunContextWrapper(Protocol[_TContext]):  # type: ignore
+        context: _TContext
 
 
 # Placeholder tool registry. In future, implement real functions (DB lookups, etc.).
 
 
-class ToolEnvelope(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ToolEnvelope:
     """Standard envelope for tool outputs to ensure reliable event shaping.
 
     Fields:
@@ -40,6 +71,9 @@ class ToolEnvelope(BaseModel):
     - recommended_prompts: optional list of next-step suggestions
     """
 
+    # Strict shape: unknown keys are a bug in the producer, not extra payload
+    __pydantic_config__ = ConfigDict(extra="forbid")
+
     ok: bool = True
     name: str
     args: Dict[str, Any] | None = None
@@ -48,128 +82,348 @@ class ToolEnvelope(BaseModel):
     recommended_prompts: List[str] | None = None
 
 
+# Built once; only exercised when wrap_envelope(validate=True)
+_ENVELOPE_ADAPTER = TypeAdapter(ToolEnvelope)
+
+
 def wrap_envelope(
-    name: str, args: Dict[str, Any] | None, data: Any, **kw
+    name: str,
+    args: Dict[str, Any] | None,
+    data: Any,
+    *,
+    ok: bool = True,
+    meta: Dict[str, Any] | None = None,
+    recommended_prompts: Sequence[str] | None = None,
+    validate: bool = False,
 ) -> Dict[str, Any]:
-    """Create a ToolEnvelope as a plain dict to avoid coupling callers to pydantic types."""
-    env = ToolEnvelope(name=name, args=args or {}, data=data, **kw)
-    return env.model_dump()
+    """Build a ToolEnvelope-shaped plain dict.
+
+    ToolEnvelope remains the documented shape; the dict is built directly so callers
+    stay decoupled from the class and no instance is allocated per tool call. Pass
+    ``validate=True`` (debugging/tests) to check it against the cached adapter.
+
+    Optional ``meta``/``recommended_prompts`` keys are omitted when not given, so
+    readers should use ``env.get(...)``.
+    """
+    env: Dict[str, Any] = {
+        "ok": ok,
+        "name": name,
+        "args": args or {},
+        "data": data,
+    }
+    if meta is not None:
+        env["meta"] = meta
+    if recommended_prompts is not None:
+        env["recommended_prompts"] = recommended_prompts
+    if validate:
+        _ENVELOPE_ADAPTER.validate_python(env)
+    return env
+
+
+def wrap_envelope_json(
+    name: str, args: Dict[str, Any] | None, data: Any, **kw: Any
+) -> bytes:
+    """Like wrap_envelope, but returns the envelope already encoded as JSON bytes.
+
+    For callers that only ship the envelope over the wire; one orjson pass replaces
+    the dict hand-off to a slower encoder downstream.
+    """
+    return orjson.dumps(wrap_envelope(name, args, data, **kw))
+
+
+# Role gating as bit tests: each role known to a tool gets one bit at registration
+_ROLE_BITS: Dict[str, int] = {
+    "support": 1,
+    "sales": 2,
+    "planner": 4,
+    "estimator": 8,
+    "assistant": 16,
+}
 
 
-class ToolSpec(BaseModel):
+def _role_bit(role: str) -> int:
+    bit = _ROLE_BITS.get(role)
+    if bit is None:
+        bit = _ROLE_BITS[role] = 1 << len(_ROLE_BITS)
+    return bit
+
+
+def roles_to_mask(roles: Iterable[str] | None) -> int:
+    """Resolve session roles to a bitmask for ToolSpec.allows().
+
+    Roles no tool was registered with have no bit and cannot grant access.
+    """
+    mask = 0
+    for r in roles or ():
+        mask |= _ROLE_BITS.get(r, 0)
+    return mask
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ToolSpec:
     name: str
     description: str = ""
     func: Callable[..., Any]
-    params_schema: Dict[str, Any] = Field(default_factory=dict)
+    # Read-only view over a module-level schema dict; shared, never copied
+    params_schema: Mapping[str, Any] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
     # Prefer explicit schema; set to False to avoid inferring ctx parameter
     infer_schema: bool = False
     # Optional roles gating (if non-empty, only sessions with one of these roles see the tool)
-    roles_allowed: List[str] = Field(default_factory=list)
+    # Stored as a tuple so it can't drift from role_mask, which is derived from it
+    roles_allowed: tuple[str, ...] = ()
+    # params_schema compiled by fastjsonschema at registration (None if unavailable);
+    # execute_tool runs it on the kwargs before dispatch
+    validator: Optional[Callable[[Any], Any]] = field(
+        default=None, init=False, repr=False
+    )
+    # Classified once so dispatch never probes the result for __await__
+    is_async: bool = field(default=False, init=False)
+    # roles_allowed folded into bits; 0 means ungated
+    role_mask: int = field(default=0, init=False)
+    # Parameters annotated Optional[...]; an explicit None for them means "not given"
+    nullable: frozenset[str] = field(default=frozenset(), init=False)
+
+    def __post_init__(self) -> None:
+        # Frozen: derived fields are filled in once via object.__setattr__
+        # Canonical names are interned; registry keys share the same object
+        object.__setattr__(self, "name", sys.intern(self.name))
+        object.__setattr__(self, "is_async", inspect.iscoroutinefunction(self.func))
+        object.__setattr__(self, "roles_allowed", tuple(self.roles_allowed))
+        mask = 0
+        for r in self.roles_allowed:
+            mask |= _role_bit(r)
+        object.__setattr__(self, "role_mask", mask)
+        try:
+            hints = get_type_hints(self.func)
+        except Exception:
+            hints = {}
+        object.__setattr__(
+            self,
+            "nullable",
+            frozenset(k for k, h in hints.items() if type(None) in get_args(h)),
+        )
+        if fastjsonschema is not None and self.params_schema:
+            try:
+                object.__setattr__(
+                    self, "validator", fastjsonschema.compile(dict(self.params_schema))
+                )
+            except Exception as e:
+                logger.debug("tool_schema_compile_failed name=%s err=%s", self.name, e)
+
+    def allows(self, session_role_mask: int) -> bool:
+        return self.role_mask == 0 or bool(self.role_mask & session_role_mask)
+
+
+# JSON Schemas for every registered tool, parsed once (in C) from a single data file
+# and frozen behind read-only views so specs share them without copying
+_SCHEMAS: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {
+        name: MappingProxyType(schema)
+        for name, schema in orjson.loads(
+            (Path(__file__).parent / "data" / "tool_schemas.json").read_bytes()
+        ).items()
+    }
+)
 
+# Populated once at import; consumers get a read-only view
+_tool_registry: Dict[str, ToolSpec] = {}
+tool_registry: Mapping[str, ToolSpec] = MappingProxyType(_tool_registry)
 
-tool_registry: Dict[str, ToolSpec] = {}
 
+def _schema_from_hints(name: str, fn: Callable[..., Any]) -> Dict[str, Any]:
+    """JSON Schema for a tool's arguments from its type hints (ctx excluded).
 
-def _echo_context(ctx: RunContextWrapper[Any], text: str = ""):
+    ``Annotated[..., Field(...)]`` carries descriptions and bounds. The result has
+    the shape of the data/tool_schemas.json entries: closed
+    (``additionalProperties: false``), an explicit ``required`` list, no titles.
+    """
+    hints = get_type_hints(fn, include_extras=True)
+    fields: Dict[str, Any] = {}
+    for p in inspect.signature(fn).parameters.values():
+        if p.name == "ctx":
+            continue
+        default = ... if p.default is inspect.Parameter.empty else p.default
+        fields[p.name] = (hints.get(p.name, Any), default)
+    model = create_model(
+        f"{name}_params", __config__=ConfigDict(extra="forbid"), **fields
+    )
+    schema = model.model_json_schema()
+    schema.pop("title", None)
+    for prop in schema.get("properties", {}).values():
+        prop.pop("title", None)
+    schema.setdefault("required", [])
+    return schema
+
+
+def tool(
+    *, name: str, description: str, roles: Sequence[str] = ()
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register the decorated function as a tool.
+
+    The schema is generated once from the function's type hints. Tools whose
+    arguments hints can't express (nested objects, nullable optionals) keep a
+    hand-tuned schema in data/tool_schemas.json, which takes precedence.
+    """
+
+    def deco(fn: Callable[..., Any]) -> Callable[..., Any]:
+        schema = _SCHEMAS.get(name)
+        if schema is None:
+            schema = MappingProxyType(_schema_from_hints(name, fn))
+        spec = ToolSpec(
+            name=name,
+            description=description,
+            func=fn,
+            params_schema=schema,
+            infer_schema=False,
+            roles_allowed=tuple(roles),
+        )
+        # Keyed by the interned spec.name so lookups with interned strings hit the
+        # identity fast path in dict probing
+        _tool_registry[spec.name] = spec
+        return fn
+
+    return deco
+
+
+# Static next-step suggestions, shared across calls (envelopes are only ever
+# serialized downstream, so immutable tuples are safe)
+_ECHO_CONTEXT_RECS = (
+    "Show my session context keys",
+    "Echo back the last user message",
+)
+_PRODUCT_SEARCH_RECS = (
+    "Filter results by price under $50",
+    "Show only accessories",
+)
+_ORDER_LOOKUP_RECS_OK = (
+    "Create a return",
+    "Update shipping address",
+)
+_ORDER_CREATE_RECS = (
+    "Send order confirmation",
+    "Add shipping details",
+)
+_TICKET_UPDATE_RECS = (
+    "Escalate ticket",
+    "Assign to Tier 2",
+)
+_PROJECT_TASK_CREATE_RECS = (
+    "List project tasks",
+    "Assign a teammate",
+)
+_TICKET_SEARCH_RECS = (
+    "Assign to SupportAgent1",
+    "Escalate to Tier 2",
+)
+_PROJECT_TASK_LIST_RECS = (
+    "Create a follow-up task",
+    "Assign a teammate",
+)
+_GENERIC_QUERY_RECS = (
+    "Summarize results",
+    "Filter by a different field",
+)
+_CATALOG_SEARCH_RECS = (
+    "Filter by category Accessories",
+    "Sort by price ascending",
+    "Show only items in stock",
+)
+_CATALOG_FACETS_RECS = (
+    "Search catalog for top facet",
+    "Filter results by this facet",
+)
+_SUPABASE_SELECT_RECS = (
+    "Filter by another field",
+    "Increase the limit",
+)
+
+
+@functools.lru_cache(maxsize=128)
+def _weather_recs(city: str) -> tuple[str, ...]:
+    return (f"Do you want a 5-day forecast for {city}?",)
+
+
+@tool(name="echo_context", description="Echo input args for debugging/grounding")
+def _echo_context(
+    ctx: RunContextWrapper[Any],
+    text: Annotated[str, Field(description="Text to echo back")] = "",
+):
     """Simple tool: echoes a provided text for debugging / grounding."""
-    meta = getattr(ctx, "context", {}) if ctx else {}
-    data = {"text": text, "ctx_keys": sorted(list(meta.keys()))}
+    meta: Mapping[str, Any] = (ctx.context if ctx is not None else None) or {}
+    # Insertion order is stable and as useful for debugging; skip the O(n log n) sort
+    data = {"text": text, "ctx_keys": list(meta)}
     return wrap_envelope(
         name="echo_context",
         args={"text": text},
         data=data,
-        recommended_prompts=[
-            "Show my session context keys",
-            "Echo back the last user message",
-        ],
+        recommended_prompts=_ECHO_CONTEXT_RECS,
     )
 
 
-def _weather(ctx: RunContextWrapper[Any], city: str) -> Dict[str, Any]:
+@tool(
+    name="weather",
+    description="Return a demo weather forecast for a city",
+    roles=("support", "assistant"),
+)
+def _weather(
+    ctx: RunContextWrapper[Any],
+    city: Annotated[str, Field(description="City name")],
+) -> Dict[str, Any]:
     """Return simple faux weather for a city (demo)."""
     data = {"city": city, "forecast": "sunny", "temp_c": 23}
     return wrap_envelope(
         name="weather",
         args={"city": city},
         data=data,
-        recommended_prompts=[f"Do you want a 5-day forecast for {city}?"],
+        recommended_prompts=_weather_recs(city),
     )
 
 
+# Static demo catalog, built once at import. Items are shared between calls;
+# envelopes are only serialized, never mutated
+_PRODUCTS = (
+    {"id": "sku-1", "name": "Widget Pro", "price": 49.99},
+    {"id": "sku-2", "name": "Widget Mini", "price": 19.99},
+    {"id": "sku-3", "name": "Widget Max", "price": 89.99},
+)
+
+
+@tool(
+    name="product_search",
+    description="Search a demo product catalog",
+    roles=("sales",),
+)
 def _product_search(
-    ctx: RunContextWrapper[Any], query: str, limit: int = 3
+    ctx: RunContextWrapper[Any],
+    query: Annotated[str, Field(description="Search query")],
+    limit: Annotated[int, Field(ge=1, le=20)] = 3,
 ) -> Dict[str, Any]:
     """Search a pretend catalog (demo)."""
-    items = [
-        {"id": "sku-1", "name": "Widget Pro", "price": 49.99},
-        {"id": "sku-2", "name": "Widget Mini", "price": 19.99},
-        {"id": "sku-3", "name": "Widget Max", "price": 89.99},
-    ]
-    results = items[: max(1, min(limit, len(items)))]
+    n = max(1, min(limit, len(_PRODUCTS)))
+    results = list(_PRODUCTS[:n])
     return wrap_envelope(
         name="product_search",
         args={"query": query, "limit": limit},
         data={"query": query, "results": results},
-        recommended_prompts=[
-            "Filter results by price under $50",
-            "Show only accessories",
-        ],
+        recommended_prompts=_PRODUCT_SEARCH_RECS,
     )
 
 
-# Register initial tools
-tool_registry["echo_context"] = ToolSpec(
-    name="echo_context",
-    description="Echo input args for debugging/grounding",
-    func=_echo_context,
-    params_schema={
-        "type": "object",
-        "properties": {"text": {"type": "string", "description": "Text to echo back"}},
-        "required": [],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-)
-tool_registry["weather"] = ToolSpec(
-    name="weather",
-    description="Return a demo weather forecast for a city",
-    func=_weather,
-    params_schema={
-        "type": "object",
-        "properties": {"city": {"type": "string", "description": "City name"}},
-        "required": ["city"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["support", "assistant"],
-)
-tool_registry["product_search"] = ToolSpec(
-    name="product_search",
-    description="Search a demo product catalog",
-    func=_product_search,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "query": {"type": "string", "description": "Search query"},
-            "limit": {"type": "integer", "minimum": 1, "maximum": 20, "default": 3},
-        },
-        "required": ["query"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
-)
-
-
 # -----------------------
 # Approved demo tools
 # -----------------------
 
 
-def _order_lookup(ctx: RunContextWrapper[Any], order_id: str) -> Dict[str, Any]:
+@tool(name="order_lookup", description="Look up an order by order_id", roles=("sales",))
+def _order_lookup(
+    ctx: RunContextWrapper[Any],
+    order_id: Annotated[str, Field(description="Order identifier")],
+) -> Dict[str, Any]:
     order = mock_data.find_order(order_id)
     data = order or {"message": f"No order found for id {order_id}"}
-    rec = ["Create a return", "Update shipping address"] if order else []
+    rec = _ORDER_LOOKUP_RECS_OK if order else ()
     return wrap_envelope(
         name="order_lookup",
         args={"order_id": order_id},
@@ -178,6 +432,11 @@ def _order_lookup(ctx: RunContextWrapper[Any], order_id: str) -> Dict[str, Any]:
     )
 
 
+@tool(
+    name="order_create",
+    description="Create an order in the mock store",
+    roles=("sales",),
+)
 def _order_create(
     ctx: RunContextWrapper[Any],
     items: List[Dict[str, Any]],
@@ -188,10 +447,15 @@ def _order_create(
         name="order_create",
         args={"items": items, "customer_info": customer_info},
         data=order,
-        recommended_prompts=["Send order confirmation", "Add shipping details"],
+        recommended_prompts=_ORDER_CREATE_RECS,
     )
 
 
+@tool(
+    name="ticket_update",
+    description="Update a support ticket's status or add a note",
+    roles=("support",),
+)
 def _ticket_update(
     ctx: RunContextWrapper[Any],
     ticket_id: str,
@@ -204,10 +468,15 @@ def _ticket_update(
         name="ticket_update",
         args={"ticket_id": ticket_id, "status": status, "note": note},
         data=data,
-        recommended_prompts=["Escalate ticket", "Assign to Tier 2"],
+        recommended_prompts=_TICKET_UPDATE_RECS,
     )
 
 
+@tool(
+    name="project_task_create",
+    description="Create a task in a project",
+    roles=("planner", "estimator"),
+)
 def _project_task_create(
     ctx: RunContextWrapper[Any],
     project_id: str,
@@ -226,99 +495,15 @@ def _project_task_create(
             "due": due,
         },
         data=data,
-        recommended_prompts=["List project tasks", "Assign a teammate"],
+        recommended_prompts=_PROJECT_TASK_CREATE_RECS,
     )
 
 
-# Register approved tools with explicit schemas and role gating
-tool_registry["order_lookup"] = ToolSpec(
-    name="order_lookup",
-    description="Look up an order by order_id",
-    func=_order_lookup,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "order_id": {"type": "string", "description": "Order identifier"}
-        },
-        "required": ["order_id"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
-)
-
-tool_registry["order_create"] = ToolSpec(
-    name="order_create",
-    description="Create an order in the mock store",
-    func=_order_create,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "items": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "id": {"type": "string"},
-                        "qty": {"type": "integer", "minimum": 1},
-                        "price": {"type": "number"},
-                    },
-                    "required": ["id", "qty"],
-                    "additionalProperties": False,
-                },
-            },
-            "customer_info": {
-                "type": "object",
-                "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
-                "required": ["name"],
-                "additionalProperties": True,
-            },
-        },
-        "required": ["items", "customer_info"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
-)
-
-tool_registry["ticket_update"] = ToolSpec(
-    name="ticket_update",
-    description="Update a support ticket's status or add a note",
-    func=_ticket_update,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "ticket_id": {"type": "string"},
-            "status": {"type": "string"},
-            "note": {"type": "string"},
-        },
-        "required": ["ticket_id"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["support"],
-)
-
-tool_registry["project_task_create"] = ToolSpec(
-    name="project_task_create",
-    description="Create a task in a project",
-    func=_project_task_create,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "project_id": {"type": "string"},
-            "title": {"type": "string"},
-            "assignee": {"type": "string"},
-            "due": {"type": "string"},
-        },
-        "required": ["project_id", "title"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["planner", "estimator"],
+@tool(
+    name="ticket_search",
+    description="Search support tickets by text, status, and tags",
+    roles=("support",),
 )
-
-
 def _ticket_search(
     ctx: RunContextWrapper[Any],
     query: Optional[str] = None,
@@ -330,10 +515,15 @@ def _ticket_search(
         name="ticket_search",
         args={"query": query, "status": status, "tags": tags},
         data={"results": res},
-        recommended_prompts=["Assign to SupportAgent1", "Escalate to Tier 2"],
+        recommended_prompts=_TICKET_SEARCH_RECS,
     )
 
 
+@tool(
+    name="project_task_list",
+    description="List tasks for a project with optional filters",
+    roles=("planner", "estimator"),
+)
 def _project_task_list(
     ctx: RunContextWrapper[Any],
     project_id: str,
@@ -352,47 +542,15 @@ def _project_task_list(
         name="project_task_list",
         args={"project_id": project_id, "status": status, "assignee": assignee},
         data=data,
-        recommended_prompts=["Create a follow-up task", "Assign a teammate"],
+        recommended_prompts=_PROJECT_TASK_LIST_RECS,
     )
 
 
-tool_registry["ticket_search"] = ToolSpec(
-    name="ticket_search",
-    description="Search support tickets by text, status, and tags",
-    func=_ticket_search,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "query": {"type": "string"},
-            "status": {"type": "string"},
-            "tags": {"type": "array", "items": {"type": "string"}},
-        },
-        "required": [],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["support"],
-)
-
-tool_registry["project_task_list"] = ToolSpec(
-    name="project_task_list",
-    description="List tasks for a project with optional filters",
-    func=_project_task_list,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "project_id": {"type": "string"},
-            "status": {"type": "string"},
-            "assignee": {"type": "string"},
-        },
-        "required": ["project_id"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["planner", "estimator"],
+@tool(
+    name="generic_query",
+    description="Run a safe read-only query over mock JSON tables (catalog, orders, tickets, projects).",
+    roles=("planner", "estimator", "support", "sales"),
 )
-
-
 def _generic_query(
     ctx: RunContextWrapper[Any],
     table: str,
@@ -416,51 +574,20 @@ def _generic_query(
             "offset": offset,
         },
         data=res,
-        recommended_prompts=["Summarize results", "Filter by a different field"],
+        recommended_prompts=_GENERIC_QUERY_RECS,
     )
 
 
-tool_registry["generic_query"] = ToolSpec(
-    name="generic_query",
-    description="Run a safe read-only query over mock JSON tables (catalog, orders, tickets, projects).",
-    func=_generic_query,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "table": {
-                "type": "string",
-                "enum": ["catalog", "orders", "tickets", "projects"],
-            },
-            "where": {"type": "object", "additionalProperties": True},
-            "select": {"type": "array", "items": {"type": "string"}},
-            "sort": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "properties": {
-                        "field": {"type": "string"},
-                        "dir": {"type": "string", "enum": ["asc", "desc"]},
-                    },
-                    "required": ["field"],
-                    "additionalProperties": False,
-                },
-            },
-            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 25},
-            "offset": {"type": "integer", "minimum": 0, "default": 0},
-        },
-        "required": ["table"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["planner", "estimator", "support", "sales"],
-)
-
-
 # -----------------------
 # Catalog search and facets (Approved)
 # -----------------------
 
 
+@tool(
+    name="catalog_search",
+    description="Search the product catalog with optional filters, sort, and paging",
+    roles=("sales",),
+)
 def _catalog_search(
     ctx: RunContextWrapper[Any],
     query: Optional[str] = None,
@@ -486,88 +613,34 @@ def _catalog_search(
             "page_size": page_size,
         },
         data=res,
-        recommended_prompts=[
-            "Filter by category Accessories",
-            "Sort by price ascending",
-            "Show only items in stock",
-        ],
+        recommended_prompts=_CATALOG_SEARCH_RECS,
     )
 
 
-def _catalog_facets(ctx: RunContextWrapper[Any], field: str) -> Dict[str, Any]:
+@tool(
+    name="catalog_facets",
+    description="Return facet counts for a catalog field (category, brand, tags)",
+    roles=("sales",),
+)
+def _catalog_facets(
+    ctx: RunContextWrapper[Any], field: Literal["category", "brand", "tags"]
+) -> Dict[str, Any]:
     data = mock_data.catalog_facets(field)
     return wrap_envelope(
         name="catalog_facets",
         args={"field": field},
         data={"field": field, "counts": data},
-        recommended_prompts=[
-            "Search catalog for top facet",
-            "Filter results by this facet",
-        ],
+        recommended_prompts=_CATALOG_FACETS_RECS,
     )
 
 
-tool_registry["catalog_search"] = ToolSpec(
-    name="catalog_search",
-    description="Search the product catalog with optional filters, sort, and paging",
-    func=_catalog_search,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "query": {"type": "string"},
-            "filters": {
-                "type": "object",
-                "properties": {
-                    "category": {"type": "string"},
-                    "tags": {"type": "array", "items": {"type": "string"}},
-                    "price_min": {"type": "number"},
-                    "price_max": {"type": "number"},
-                },
-                "additionalProperties": False,
-            },
-            "sort": {
-                "type": "string",
-                "enum": ["price_asc", "price_desc", "rating_desc", "price"],
-            },
-            "page": {"type": "integer", "minimum": 1, "default": 1},
-            "page_size": {
-                "type": "integer",
-                "minimum": 1,
-                "maximum": 50,
-                "default": 10,
-            },
-        },
-        "required": [],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
-)
-
-tool_registry["catalog_facets"] = ToolSpec(
-    name="catalog_facets",
-    description="Return facet counts for a catalog field (category, brand, tags)",
-    func=_catalog_facets,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "field": {"type": "string", "enum": ["category", "brand", "tags"]}
-        },
-        "required": ["field"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
-)
-
-
 # -----------------------
 # Supabase (scaffold example)
 # -----------------------
 
 
-def _get_supabase():  # pragma: no cover - simple runtime getter
-    # Accept common env names; prefer explicit server-side service key variants
+def _read_env() -> tuple[Optional[str], Optional[str]]:
+    """Return (url, key) from env, normalized; prefers server-side service keys."""
     url = os.getenv("SUPABASE_URL")
     raw_key = (
         os.getenv("SUPABASE_SERVICE_KEY")
@@ -580,40 +653,87 @@ def _get_supabase():  # pragma: no cover - simple runtime getter
     key = None
     if isinstance(raw_key, str):
         key = raw_key.strip().strip('"').strip("'")
+    return url, key
+
+
+# Parsed (url, key), resolved on first use; .env is loaded after this module imports
+_SUPABASE_CFG: tuple[Optional[str], Optional[str]] | None = None
+
+
+def _cfg() -> tuple[Optional[str], Optional[str]]:
+    global _SUPABASE_CFG
+    if _SUPABASE_CFG is None:
+        _SUPABASE_CFG = _read_env()
+    return _SUPABASE_CFG
+
+
+def reset_supabase_config() -> None:
+    """Forget the cached Supabase env config so the next call re-reads it (tests)."""
+    global _SUPABASE_CFG
+    _SUPABASE_CFG = None
+
+
+@functools.lru_cache(maxsize=4)
+def _get_supabase(url: Optional[str], key: Optional[str]):  # pragma: no cover
+    """Build (once per url/key) a client whose HTTP pool is reused across calls.
+
+    create_client errors propagate so a transient failure is not cached.
+    """
     if not (url and key and create_client):
-        try:
-            logger.debug(
-                "supabase_get_client_missing url=%s key_present=%s create_client=%s",
-                bool(url),
-                bool(key),
-                bool(create_client),
-            )
-        except Exception:
-            pass
+        logger.debug(
+            "supabase_get_client_missing url=%s key_present=%s create_client=%s",
+            bool(url),
+            bool(key),
+            bool(create_client),
+        )
         return None
+    return create_client(url, key)
+
+
+@functools.lru_cache(maxsize=4)
+def _supabase_host(url: Optional[str]) -> Optional[str]:
+    # .env is loaded after this module is imported, so derive lazily (once per url)
+    return urlparse(url).netloc if url else None
+
+
+def _supabase_client():
+    url, key = _cfg()
     try:
-        return create_client(url, key)
+        return _get_supabase(url, key)
     except Exception as e:
-        try:
-            logger.debug("supabase_create_client_error: %s", str(e))
-        except Exception:
-            pass
+        logger.debug("supabase_create_client_error: %s", e)
         return None
 
 
-def _supabase_select(
+def _apply_filter(q: Any, kv: tuple[str, Any]) -> Any:
+    k, v = kv
+    if isinstance(v, (list, tuple, set, frozenset)):
+        return q.in_(k, list(v))
+    return q.eq(k, v)
+
+
+def _extract_rows(resp: Any) -> List[Any]:
+    # supabase-py v2 returns an APIResponse with .data; older clients a plain dict
+    if isinstance(resp, dict):
+        return resp.get("data") or []
+    return getattr(resp, "data", None) or []
+
+
+def _supabase_select_impl(
     ctx: RunContextWrapper[Any],
     table: str,
-    filters: Optional[Dict[str, Any]] = None,
-    limit: Optional[int] = 25,
+    filters: Optional[Dict[str, Any]],
+    limit: Optional[int],
+    *,
+    proxy_args: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Read-only select from a Supabase table with simple equality filters.
-
-    Notes:
-    - Uses env SUPABASE_URL + SUPABASE_ANON_KEY/SUPABASE_SERVICE_KEY.
-    - Equality filters only (safe default). Extend cautiously.
-    """
-    sb = _get_supabase()
+    # Proxy calls keep the supabase_select envelope (name/args) and only add meta
+    proxy_meta = (
+        {"proxy_for": "supabase_select_proxy", "proxy_args": proxy_args}
+        if proxy_args is not None
+        else None
+    )
+    sb = _supabase_client()
     if not sb:
         # Provide a slightly more actionable error if client isn't available
         return wrap_envelope(
@@ -623,11 +743,10 @@ def _supabase_select(
                 "error": "Supabase client not configured",
                 "hint": "Ensure SUPABASE_URL and SUPABASE_SERVICE_KEY (or SUPABASE_SERVICE_ROLE_KEY) are set in backend/.env and the server was restarted.",
             },
+            meta=proxy_meta,
         )
-    q = sb.table(table).select("*")
     f = filters or {}
-    for k, v in f.items():
-        q = q.eq(k, v)
+    q = functools.reduce(_apply_filter, f.items(), sb.table(table).select("*"))
     try:
         lim = max(1, min(100, int(limit or 25)))
     except Exception:
@@ -635,82 +754,69 @@ def _supabase_select(
     q = q.limit(lim)
     try:
         resp = q.execute()
-        # supabase-py v2 returns a dict-like response with .data
-        rows = (
-            getattr(resp, "data", None) or resp.get("data")
-            if isinstance(resp, dict)
-            else None
-        )
-        # Best-effort debug log (no secrets): include host, table, filters, row_count
-        try:
-            host = None
-            url = os.getenv("SUPABASE_URL")
-            if url:
-                host = urlparse(url).netloc
+        rows = _extract_rows(resp)
+        # Debug log (no secrets): include host, table, filters, row_count
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 "supabase_select ok host=%s table=%s filters=%s limit=%s row_count=%s",
-                host,
+                _supabase_host(_cfg()[0]),
                 table,
                 f,
                 lim,
-                len(rows or []),
+                len(rows),
             )
-        except Exception:
-            pass
         return wrap_envelope(
             name="supabase_select",
             args={"table": table, "filters": filters, "limit": lim},
-            data={"rows": rows or []},
+            data={"rows": rows},
             meta={
-                "row_count": len(rows or []),
+                "row_count": len(rows),
                 "table": table,
                 "filters": f or {},
                 "limit": lim,
+                **(proxy_meta or {}),
             },
-            recommended_prompts=["Filter by another field", "Increase the limit"],
+            recommended_prompts=_SUPABASE_SELECT_RECS,
         )
     except Exception as e:
         # Log error for troubleshooting; avoid leaking secrets
-        try:
-            host = None
-            url = os.getenv("SUPABASE_URL")
-            if url:
-                host = urlparse(url).netloc
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 "supabase_select error host=%s table=%s filters=%s limit=%s err=%s",
-                host,
+                _supabase_host(_cfg()[0]),
                 table,
                 filters,
                 limit,
-                str(e),
+                e,
             )
-        except Exception:
-            pass
         return wrap_envelope(
             name="supabase_select",
             args={"table": table, "filters": filters, "limit": lim},
             data={"error": str(e)},
+            meta=proxy_meta,
         )
 
 
-tool_registry["supabase_select"] = ToolSpec(
+# Explicit schema keeps 'filters' a bare object and omits root additionalProperties
+# for compatibility with the viz/Pydantic path
+@tool(
     name="supabase_select",
     description="Read rows from a Supabase table with simple equality filters (env-configured)",
-    func=_supabase_select,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "table": {"type": "string", "description": "Table name"},
-            # Keep filters flexible but avoid explicit additionalProperties to satisfy viz/Pydantic
-            "filters": {"type": "object"},
-            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 25},
-        },
-        "required": ["table"],
-        # Omit additionalProperties at the root level for compatibility in viz path
-    },
-    infer_schema=False,
-    roles_allowed=["assistant", "support", "sales", "planner", "estimator"],
+    roles=("assistant", "support", "sales", "planner", "estimator"),
 )
+def _supabase_select(
+    ctx: RunContextWrapper[Any],
+    table: str,
+    filters: Optional[Dict[str, Any]] = None,
+    limit: Optional[int] = 25,
+) -> Dict[str, Any]:
+    """Read-only select from a Supabase table with simple equality filters.
+
+    Notes:
+    - Uses env SUPABASE_URL + SUPABASE_ANON_KEY/SUPABASE_SERVICE_KEY.
+    - Equality filters only (safe default); a list value matches any of its items (IN).
+    """
+    return _supabase_select_impl(ctx, table, filters, limit)
 
 
 # -----------------------
@@ -718,6 +824,11 @@ tool_registry["supabase_select"] = ToolSpec(
 # -----------------------
 
 
+@tool(
+    name="supabase_select_proxy",
+    description="Proxy for Supabase select with a simple key/value filter (graph-safe schema)",
+    roles=("sales",),
+)
 def _supabase_select_proxy(
     ctx: RunContextWrapper[Any],
     table: str,
@@ -727,59 +838,72 @@ def _supabase_select_proxy(
 ) -> Dict[str, Any]:
     """Graph-safe proxy for Supabase select with simple key/value filter.
 
-    This avoids nested object schemas by accepting a single filter pair. It delegates to
-    the underlying supabase_select implementation and then adjusts the envelope to
-    reflect the proxy name for UI consistency.
+    This avoids nested object schemas by accepting a single filter pair. It shares the
+    supabase_select implementation (envelope name/args unchanged for purist alignment)
+    and marks the proxy path plus its flat inputs in meta.
     """
     filters: Optional[Dict[str, Any]] = None
     if filter_key:
         filters = {filter_key: filter_value}
-    ret = _supabase_select(ctx=ctx, table=table, filters=filters, limit=limit)
-    # Keep the underlying envelope (name = supabase_select) for purist alignment.
-    # Optionally annotate meta to indicate the proxy path was used, without changing args/name.
-    try:
-        if isinstance(ret, dict):
-            meta = ret.get("meta") or {}
-            meta.setdefault("proxy_for", "supabase_select_proxy")
-            # Optionally capture the flat proxy inputs
-            meta.setdefault(
-                "proxy_args",
-                {"filter_key": filter_key, "filter_value": filter_value},
-            )
-            ret["meta"] = meta
-    except Exception:
-        pass
-    return ret
+    return _supabase_select_impl(
+        ctx,
+        table,
+        filters,
+        limit,
+        proxy_args={"filter_key": filter_key, "filter_value": filter_value},
+    )
 
 
-tool_registry["supabase_select_proxy"] = ToolSpec(
-    name="supabase_select_proxy",
-    description="Proxy for Supabase select with a simple key/value filter (graph-safe schema)",
-    func=_supabase_select_proxy,
-    params_schema={
-        "type": "object",
-        "properties": {
-            "table": {"type": "string", "description": "Table name"},
-            "filter_key": {"type": "string", "description": "Column to match"},
-            "filter_value": {"type": "string", "description": "Value to match"},
-            "limit": {"type": "integer", "minimum": 1, "maximum": 100, "default": 25},
-        },
-        "required": ["table"],
-        "additionalProperties": False,
-    },
-    infer_schema=False,
-    roles_allowed=["sales"],
+# Registration is complete (the registry is fixed after import): snapshot what
+# schema checks need so they never walk the specs again
+_FROZEN: tuple[tuple[str, bool, bool], ...] = tuple(
+    (n, bool(s.params_schema), s.infer_schema) for n, s in _tool_registry.items()
 )
 
 
+def validate_schemas() -> None:
+    """Raise ValueError unless every tool has an explicit schema and no inference."""
+    bad = [n for n, has_schema, infer in _FROZEN if not has_schema or infer]
+    if bad:
+        raise ValueError(
+            f"Tools need an explicit params_schema, no infer: {', '.join(bad)}"
+        )
+
+
+def _resolve_tool(name: str, kwargs: Dict[str, Any]) -> ToolSpec:
+    # Registry keys are interned: callers dispatching the same wire-decoded name
+    # repeatedly can sys.intern it once to get identity-compare lookups
+    try:
+        spec = _tool_registry[name]
+    except KeyError:
+        raise ValueError(f"Unknown tool: {name}") from None
+    validator = spec.validator
+    if validator is not None:
+        # The JSON schemas don't admit null; None for an Optional parameter is
+        # validated as if the argument were omitted
+        nullable = spec.nullable
+        args = {
+            k: v
+            for k, v in kwargs.items()
+            if k != "ctx" and not (v is None and k in nullable)
+        }
+        try:
+            validator(args)
+        except fastjsonschema.JsonSchemaException as e:
+            raise ValueError(f"Invalid arguments for {name}: {e.message}") from e
+    return spec
+
+
+def execute_tool_sync(name: str, **kwargs) -> Any:
+    """Run a synchronous tool without creating a coroutine."""
+    spec = _resolve_tool(name, kwargs)
+    if spec.is_async:
+        raise TypeError(f"Tool {name} is async; use execute_tool")
+    return spec.func(**kwargs)
+
+
 async def execute_tool(name: str, **kwargs) -> Any:
-    spec = tool_registry.get(name)
-    if not spec:
-        raise ValueError(f"Unknown tool: {name}")
-    func = spec.func
-    if callable(func):
-        result = func(**kwargs)
-        if hasattr(result, "__await__"):
-            return await result  # async
-        return result
-    return func
+    spec = _resolve_tool(name, kwargs)
+    if spec.is_async:
+        return await spec.func(**kwargs)
+    return spec.func(**kwargs)
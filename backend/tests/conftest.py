@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+
+# app.py imports its modules through the `backend` package, so tests do too (one
+# package root: a single store, tool registry and network cache). Make the repo
+# root importable for that
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def http():
+    # In-process ASGI client: no live server or sockets needed. Tests using it must
+    # run on the same session-scoped loop (mark with loop_scope="session").
+    # trust_env=False skips proxy/netrc/SSL env probing at client setup
+    # Imported here so unit tests that never touch HTTP don't load the whole app
+    from backend.app import app
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://test",
+        timeout=10,
+        trust_env=False,
+    ) as client:
+        yield client
+
+
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+@pytest.fixture
+def post_json(http):
+    # POST with an orjson-encoded body instead of httpx's stdlib json= encoding
+    def _post(url: str, payload):
+        return http.post(url, content=orjson.dumps(payload), headers=_JSON_HEADERS)
+
+    return _post
@@ -3,8 +3,8 @@ from types import SimpleNamespace
 
 import pytest
 
-from app_agents import sdk_manager
-from app_agents.core.store.memory_store import store
+from backend.app_agents import sdk_manager
+from backend.app_agents.core.store.memory_store import store
 
 
 class DummyAgent:
@@ -1,34 +1,52 @@
 import asyncio
+from uuid import uuid4
 
-import httpx
+import orjson
 import pytest
 
-BASE_URL = "http://localhost:8000"
+from backend.app_agents.core.store.memory_store import store
 
 
-@pytest.mark.asyncio
-async def test_handoff_override_emits_event():
-    async with httpx.AsyncClient(timeout=10) as client:
-        # Create session
-        r = await client.post(
-            f"{BASE_URL}/api/sdk/session/create",
-            json={"instructions": "Be terse.", "scenario_id": "default"},
-        )
-        assert r.status_code == 200, r.text
-        sid = r.json()["session_id"]
+async def _wait_for_event(http, sid: str, type_: str) -> dict:
+    # Stream events until the first one of the given type instead of re-reading
+    # the whole buffer
+    async with http.stream(
+        "GET", f"/api/sdk/session/{sid}/events/stream", params={"until": type_}
+    ) as resp:
+        assert resp.status_code == 200
+        async for line in resp.aiter_lines():
+            if line.startswith("data: "):
+                ev = orjson.loads(line[6:])
+                if ev.get("type") == type_:
+                    return ev
+    raise AssertionError(f"stream closed without a {type_} event")
 
-        # Apply override to sales
-        r2 = await client.post(
-            f"{BASE_URL}/api/sdk/session/set_active_agent",
-            json={"session_id": sid, "agent_name": "sales"},
-        )
-        assert r2.status_code == 200, r2.text
 
-        # Fetch events and assert handoff_override exists
-        r3 = await client.get(f"{BASE_URL}/api/sdk/session/{sid}/events")
-        assert r3.status_code == 200, r3.text
-        events = r3.json()
-        assert any(
-            e.get("type") == "handoff_override" and e.get("agent_id") == "sales"
-            for e in events
-        )
+@pytest.mark.asyncio(loop_scope="session")
+async def test_handoff_override_emits_event(http, post_json):
+    # Client-chosen session id lets the stream subscription start alongside the
+    # create + override batch instead of after it
+    sid = str(uuid4())
+    batch = post_json(
+        "/api/sdk/batch",
+        [
+            {
+                "op": "create",
+                "session_id": sid,
+                "instructions": "Be terse.",
+                "scenario_id": "default",
+            },
+            {"op": "set_active_agent", "session_id": sid, "agent_name": "sales"},
+        ],
+    )
+    r, ev = await asyncio.wait_for(
+        asyncio.gather(batch, _wait_for_event(http, sid, "handoff_override")),
+        timeout=10,
+    )
+    assert r.status_code == 200, r.text
+    created, override = r.json()
+    assert created["session_id"] == sid
+    assert override == {"ok": True}
+    assert ev.get("agent_id") == "sales"
+    # The events stream drops its store listener once `until` has matched
+    assert sid not in store._listeners
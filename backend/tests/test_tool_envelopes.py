@@ -1,45 +1,110 @@
+import orjson
 import pytest
+from pydantic import TypeAdapter, ValidationError
 
-from app_agents.tools import tool_registry, wrap_envelope
+from backend.app_agents.tools import (
+    ToolEnvelope,
+    _schema_from_hints,
+    tool_registry,
+    validate_schemas,
+    wrap_envelope,
+    wrap_envelope_json,
+)
+
+_ENV_KEYS = frozenset(("ok", "name", "args", "data"))
+
+
+def _is_env(e) -> bool:
+    return _ENV_KEYS <= e.keys()
 
 
 def test_tool_registry_has_explicit_schemas():
     # Ensure all registered tools specify explicit schemas and do not infer
-    for name, spec in tool_registry.items():
-        assert spec.params_schema, f"{name} missing params_schema"
-        assert spec.infer_schema is False, f"{name} should have infer_schema=False"
+    validate_schemas()
+
+
+def test_schema_from_hints_skips_ctx():
+    def _demo(ctx, city: str, days: int = 3):
+        return None
+
+    schema = _schema_from_hints("demo", _demo)
+    assert set(schema["properties"]) == {"city", "days"}
+    assert schema["required"] == ["city"]
+    assert schema["properties"]["days"]["type"] == "integer"
+    # Same closed, title-free shape as the hand-written JSON schemas
+    assert schema["additionalProperties"] is False
+    assert "title" not in schema and "title" not in schema["properties"]["city"]
+
+
+def test_hint_derived_tool_schemas():
+    # These tools have no JSON entry; their schemas come from Annotated hints
+    assert tool_registry["weather"].params_schema == {
+        "type": "object",
+        "properties": {"city": {"type": "string", "description": "City name"}},
+        "required": ["city"],
+        "additionalProperties": False,
+    }
+    limit = tool_registry["product_search"].params_schema["properties"]["limit"]
+    assert limit == {"type": "integer", "minimum": 1, "maximum": 20, "default": 3}
+    field = tool_registry["catalog_facets"].params_schema["properties"]["field"]
+    assert field == {"type": "string", "enum": ["category", "brand", "tags"]}
 
 
 def test_wrap_envelope_shape():
     data = {"k": 1}
     env = wrap_envelope("demo_tool", {"a": 1}, data)
     assert isinstance(env, dict)
-    for key in ("ok", "name", "args", "data"):
-        assert key in env, f"missing {key}"
+    assert _is_env(env), f"missing {_ENV_KEYS - env.keys()}"
     assert env["ok"] is True
     assert env["name"] == "demo_tool"
     assert env["args"] == {"a": 1}
     assert env["data"] == data
+    # Optional keys are only present when provided
+    assert "meta" not in env and "recommended_prompts" not in env
+    env = wrap_envelope("demo_tool", None, data, meta={"m": 1})
+    assert env["meta"] == {"m": 1}
+
+
+def test_wrap_envelope_json_matches_dict():
+    kw = {"meta": {"m": 1}, "recommended_prompts": ("Next",)}
+    raw = wrap_envelope_json("demo_tool", {"a": 1}, [1], **kw)
+    assert isinstance(raw, bytes)
+    assert orjson.loads(raw) == {
+        **wrap_envelope("demo_tool", {"a": 1}, [1], **kw),
+        "recommended_prompts": ["Next"],
+    }
+
+
+def test_wrap_envelope_validate_flag():
+    env = wrap_envelope("demo_tool", None, [1, 2], validate=True)
+    assert env["args"] == {}
+    with pytest.raises(ValidationError) as bad_type:
+        wrap_envelope("demo_tool", {}, None, recommended_prompts=5, validate=True)
+    assert bad_type.value.errors()[0]["loc"] == ("recommended_prompts",)
+    # The envelope shape is closed: unknown keys are rejected (extra="forbid" on a
+    # pydantic dataclass reports them as unexpected keyword arguments)
+    with pytest.raises(ValidationError) as extra:
+        TypeAdapter(ToolEnvelope).validate_python({"name": "demo_tool", "extra": 1})
+    assert [(e["type"], e["loc"]) for e in extra.value.errors()] == [
+        ("unexpected_keyword_argument", ("extra",))
+    ]
 
 
-def test_registered_tools_return_envelopes():
-    # Call a few demo tools with minimal args and assert envelope shape
-    # echo_context
-    env1 = tool_registry["echo_context"].func(ctx=None, text="hi")
-    for key in ("ok", "name", "args", "data"):
-        assert key in env1
-    assert env1["name"] == "echo_context"
-
-    # weather
-    env2 = tool_registry["weather"].func(ctx=None, city="Paris")
-    for key in ("ok", "name", "args", "data"):
-        assert key in env2
-    assert env2["name"] == "weather"
-    assert env2["data"]["city"] == "Paris"
-
-    # product_search
-    env3 = tool_registry["product_search"].func(ctx=None, query="widget", limit=2)
-    for key in ("ok", "name", "args", "data"):
-        assert key in env3
-    assert env3["name"] == "product_search"
-    assert isinstance(env3["data"].get("results"), list)
+@pytest.mark.parametrize(
+    "name,kwargs,extra",
+    [
+        ("echo_context", {"text": "hi"}, None),
+        ("weather", {"city": "Paris"}, lambda d: d["city"] == "Paris"),
+        (
+            "product_search",
+            {"query": "widget", "limit": 2},
+            lambda d: isinstance(d.get("results"), list),
+        ),
+    ],
+)
+def test_registered_tools_return_envelopes(name, kwargs, extra):
+    # Call demo tools with minimal args and assert envelope shape
+    env = tool_registry[name].func(ctx=None, **kwargs)
+    assert _is_env(env)
+    assert env["name"] == name
+    assert extra is None or extra(env["data"])
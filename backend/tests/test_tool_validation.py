@@ -0,0 +1,32 @@
+import pytest
+
+from backend.app_agents.tools import execute_tool_sync
+
+pytest.importorskip("fastjsonschema")
+
+
+@pytest.mark.parametrize(
+    "name,kwargs",
+    [
+        ("product_search", {"query": "widget", "limit": 99}),
+        ("product_search", {"query": "widget", "limit": None}),
+        ("weather", {"city": "Paris", "unknown": 1}),
+        ("order_lookup", {}),
+    ],
+)
+def test_execute_tool_rejects_bad_args(name, kwargs):
+    with pytest.raises(ValueError, match=f"Invalid arguments for {name}") as exc:
+        execute_tool_sync(name, ctx=None, **kwargs)
+    assert exc.value.__cause__ is not None
+
+
+@pytest.mark.parametrize(
+    "name,kwargs",
+    [
+        ("ticket_update", {"ticket_id": "T1", "status": None, "note": None}),
+        ("catalog_search", {"query": None, "page": None, "page_size": None}),
+    ],
+)
+def test_execute_tool_accepts_none_for_optional_args(name, kwargs):
+    env = execute_tool_sync(name, ctx=None, **kwargs)
+    assert env["name"] == name